@@ -10,15 +10,10 @@
 from numpy import exp, array
 import logging
 from urllib.parse import urlparse
-from astropy.coordinates import SkyCoord
-from astropy.table import Table
 import sys
-try:
-	from catsHTM import cone_search
-	doCat = True
-except ImportError:
-	doCat = False
 from ampel.base.abstract.AbsAlertFilter import AbsAlertFilter
+from ampel.contrib.sample.util.metrics import instrument
+from ampel.contrib.sample.util.DecisionMemo import DecisionMemo
 
 class SampleFilter(AbsAlertFilter):
 	"""
@@ -27,6 +22,9 @@ class SampleFilter(AbsAlertFilter):
 			* subtraction FWHM and the difference between PSF and aperture magnitude
 			* detection of proper-motion and paralax for coincidence sources in GAIA DR2
 
+		The outcome of the GAIA matching can be memoized per transient and position
+		(optional run config parameters MEMO_SIZE, MEMO_TOLERANCE [arcsec], MEMO_FILE,
+		MEMO_CHECKPOINT)
 	"""
 
 	# Static version info
@@ -76,12 +74,34 @@ class SampleFilter(AbsAlertFilter):
 		self.gaia_veto_gmag_min			= 12
 		self.gaia_veto_gmag_max			= 18
 
-		# technical
-		if doCat:
+		# technical (catsHTM is imported here rather than at module level as it is heavy)
+		try:
+			from catsHTM import cone_search
+			self.cone_search = cone_search
+			self.doCat = True
+		except ImportError:
+			self.doCat = False
+		if self.doCat:
 			self.catshtm_path 			= urlparse(base_config['catsHTM.default']).path
 			self.logger.info("using catsHTM files in %s"%self.catshtm_path)
 		self.keys_to_check = ( 'fwhm', 'magdiff', 'ra', 'dec' )
 
+		# memo of GAIA matching results
+		self.memo = None
+		if run_config.get('MEMO_SIZE', 0) > 0:
+			self.memo = DecisionMemo(
+				{
+					'GAIA_RS': self.gaia_rs, 'GAIA_PM_SIGNIF': self.gaia_pm_signif,
+					'GAIA_PLX_SIGNIF': self.gaia_plx_signif, 'gmag_min': self.gaia_veto_gmag_min,
+					'gmag_max': self.gaia_veto_gmag_max, 'catsHTM': getattr(self, 'catshtm_path', None)
+				},
+				max_size=run_config['MEMO_SIZE'], tolerance=run_config.get('MEMO_TOLERANCE', 1.),
+				path=run_config.get('MEMO_FILE'),
+				checkpoint_every=run_config.get('MEMO_CHECKPOINT', 1000)
+			)
+			if self.memo.invalidated:
+				self.logger.info("Filter config changed, memo discarded")
+
 
 	def _alert_has_keys(self, photop):
 		"""
@@ -108,8 +128,11 @@ class SampleFilter(AbsAlertFilter):
 			returns: True (is a star) or False otehrwise.
 		"""
 
+		from astropy.coordinates import SkyCoord
+		from astropy.table import Table
+
 		transient_coords = SkyCoord(transient['ra'], transient['dec'], unit='deg')
-		srcs, colnames, colunits = cone_search(
+		srcs, colnames, colunits = self.cone_search(
 											'GAIADR2',
 											transient_coords.ra.rad, transient_coords.dec.rad,
 											self.gaia_rs,
@@ -141,6 +164,7 @@ class SampleFilter(AbsAlertFilter):
 		return False
 
 
+	@instrument
 	def apply(self, alert):
 		"""
 		Mandatory implementation.
@@ -187,9 +211,17 @@ class SampleFilter(AbsAlertFilter):
 
 		# check with gaia
 		if self.gaia_rs>0:
-			if not doCat:
+			if not self.doCat:
 				sys.exit("Cannot match to Gaia without catsHTM!")
-			if self.is_star_in_gaia(latest):
+			if self.memo is not None:
+				is_star = self.memo.get_or_compute(
+					alert.tran_id, latest['ra'], latest['dec'], lambda: self.is_star_in_gaia(latest)
+				)
+				if self.memo.checkpoint_due():
+					self.logger.info("Memo stats: %s" % self.memo.checkpoint())
+			else:
+				is_star = self.is_star_in_gaia(latest)
+			if is_star:
 				self.logger.debug("rejected: within %.2f arcsec from a GAIA star (PM of PLX)" %
 					(self.gaia_rs))
 				return None
@@ -7,10 +7,12 @@
 # Last Modified Date: 04.04.2021
 # Last Modified By  : jno
 
+from typing import Any, Dict, Optional
 from numpy import array
-from astropy.coordinates import SkyCoord
 from ampel.abstract.AbsAlertFilter import AbsAlertFilter
 from ampel.alert.PhotoAlert import PhotoAlert
+from ampel.contrib.sample.util.metrics import instrument
+from ampel.contrib.sample.util.DecisionMemo import DecisionMemo
 
 
 class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
@@ -24,6 +26,10 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 	* distance to known SS objects
 	* (d) real-bogus
         * Whether it seems a PS source exists at the transient position (as per alert properties).
+
+	The position based checks (galactic latitude, PS1) can be memoized per stock (memo_size > 0),
+	such that later alerts of a stock at the same position (within memo_tolerance) reuse
+	the outcome.
 	"""
 
 	# history
@@ -47,6 +53,12 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 	ps1_confusion_rad: float = 1. # reject alerts if the three PS1 sources are all within this radius [arcsec]
 	ps1_confusion_sg_tol: float = 0.5 # and if the SG score of all of these 3 sources is within this tolerance to 0.5
 
+	# memo of the position based checks
+	memo_size: int = 0 # max number of stocks/positions kept. Set to 0 to disable memo.
+	memo_tolerance: float = 1. # max position difference [arcsec] for reusing a memoized outcome
+	memo_file: Optional[str] = None # json file used to persist the memo
+	memo_checkpoint: int = 1000 # log memo statistics (and persist memo) every n lookups
+
 
 	def post_init(self):
 
@@ -59,6 +71,21 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 			'sgscore2', 'distpsnr3', 'sgscore3', 'isdiffpos', 'ra', 'dec', 'rb', 'ssdistnr'
 		)
 
+		self.memo = None
+		if self.memo_size > 0:
+			self.memo = DecisionMemo(
+				{
+					k: getattr(self, k) for k in (
+						'min_gal_lat', 'ps1_sgveto_rad', 'ps1_sgveto_th',
+						'ps1_confusion_rad', 'ps1_confusion_sg_tol'
+					)
+				},
+				max_size=self.memo_size, tolerance=self.memo_tolerance, path=self.memo_file,
+				checkpoint_every=self.memo_checkpoint
+			)
+			if self.memo.invalidated:
+				self.logger.info("Filter config changed, memo discarded")
+
 
 	def _alert_has_keys(self, photop):
 		"""
@@ -76,6 +103,7 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 
 	def get_galactic_latitude(self, transient):
 		""" Compute galactic latitude of the transient """
+		from astropy.coordinates import SkyCoord
 		coordinates = SkyCoord(transient['ra'], transient['dec'], unit='deg')
 		b = coordinates.galactic.b.deg
 		return b
@@ -109,6 +137,30 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 		return False
 
 
+	def position_veto(self, transient) -> Optional[Dict[str, Any]]:
+		"""
+		Checks depending only on the transient position.
+		Returns the rejection log extra or None if passed.
+		"""
+		# cut on galactic latitude
+		b = self.get_galactic_latitude(transient)
+		if abs(b) < self.min_gal_lat:
+			#self.logger.debug("rejected: b=%.4f, too close to Galactic plane (max allowed: %f)."% (b, self.min_gal_lat))
+			return {'galPlane': abs(b)}
+
+		# check ps1 star-galaxy score
+		if self.is_star_in_PS1(transient):
+			#self.logger.debug("rejected: closest PS1 source %.2f arcsec away with sgscore of %.2f"% (latest['distpsnr1'], latest['sgscore1']))
+			return {'distpsnr1': transient['distpsnr1']}
+
+		if self.is_confused_in_PS1(transient):
+			#self.logger.debug("rejected: three confused PS1 sources within %.2f arcsec from alert."% (self.ps1_confusion_rad))
+			return {'ps1Confusion': True}
+
+		return None
+
+
+	@instrument
 	def apply(self, alert: PhotoAlert):
 		"""
 		Mandatory implementation.
@@ -185,22 +237,17 @@ class SimpleDecentFilterCopy(AbsAlertFilter[PhotoAlert]):
 			self.logger.info(None, extra={'ssdistnr': latest['ssdistnr']})
 			return None
 
-		# cut on galactic latitude
-		b = self.get_galactic_latitude(latest)
-		if abs(b) < self.min_gal_lat:
-			#self.logger.debug("rejected: b=%.4f, too close to Galactic plane (max allowed: %f)."% (b, self.min_gal_lat))
-			self.logger.info(None, extra={'galPlane': abs(b)})
-			return None
-
-		# check ps1 star-galaxy score
-		if self.is_star_in_PS1(latest):
-			#self.logger.debug("rejected: closest PS1 source %.2f arcsec away with sgscore of %.2f"% (latest['distpsnr1'], latest['sgscore1']))
-			self.logger.info(None, extra={'distpsnr1': latest['distpsnr1']})
-			return None
-
-		if self.is_confused_in_PS1(latest):
-			#self.logger.debug("rejected: three confused PS1 sources within %.2f arcsec from alert."% (self.ps1_confusion_rad))
-			self.logger.info(None, extra={'ps1Confusion': True})
+		# galactic latitude and PS1 checks
+		if self.memo is not None:
+			veto = self.memo.get_or_compute(
+				alert.stock_id, latest['ra'], latest['dec'], lambda: self.position_veto(latest)
+			)
+			if self.memo.checkpoint_due():
+				self.logger.info("Memo", extra=self.memo.checkpoint())
+		else:
+			veto = self.position_veto(latest)
+		if veto:
+			self.logger.info(None, extra=veto)
 			return None
 
 		# congratulation alert! you made it!
@@ -9,14 +9,11 @@
 
 from typing import Dict, List, Optional, Sequence, Any, Tuple
 import numpy as np
-import sncosmo
 from ampel.type import T2UnitResult
 from ampel.view.LightCurve import LightCurve
-from astropy import units as u
-from astropy.coordinates import SkyCoord
-from astropy.table import Table
-from astropy.time import Time
 from ampel.abstract.AbsLightCurveT2Unit import AbsLightCurveT2Unit
+from ampel.contrib.sample.util.metrics import instrument
+from ampel.contrib.sample.util.photometry import get_photometry
 
 
 
@@ -48,6 +45,8 @@ class T2MultiMessMatch(AbsLightCurveT2Unit):
         The single position and energy structure can be replaced with more complex e.g. MOC regions
         or SEDs.
         """
+        from astropy import units as u
+        from astropy.time import Time
         self.mm_list = [ {'ra': 15.9*u.deg, 'dec': 45*u.deg, 'pos_error': 1*u.deg,
                           'time': Time(2459100, format='jd'), 'time_error': 0.1*u.d, 
                           'ab_mag': 17, 'ab_mag_errr': 0.5, 'mm_ID':'sample_mm_alert'} ]
@@ -58,6 +57,7 @@ class T2MultiMessMatch(AbsLightCurveT2Unit):
 
     
         
+    @instrument
     def run(self, light_curve: LightCurve) -> T2UnitResult:
         """
         Parameters
@@ -70,20 +70,23 @@ class T2MultiMessMatch(AbsLightCurveT2Unit):
         dict
         """
 
+        from astropy.coordinates import SkyCoord
+
         self.logger.info('MMmatch: {}'.format(light_curve.stock_id) )
 
-        # Extract transient comparison properties
-        tdata = light_curve.get_ntuples( ('ra','dec','jd','magpsf','sigmapsf'))
-        tdata.sort(key=lambda x: x[2])
+        # Extract transient comparison properties (photometry sorted by jd)
+        phot = get_photometry(light_curve)
+        phot = phot[np.isfinite(phot['ra']) & np.isfinite(phot['dec'])]
+        cols = ('ra', 'dec', 'jd', 'magpsf', 'sigmapsf')
         if self.match_where == 'first':
-            matchphot = tdata[0]
+            matchphot = {k: phot[k][0] for k in cols}
         elif self.match_where == 'latest':
-            matchphot = tdata[-1]
+            matchphot = {k: phot[k][-1] for k in cols}
         elif self.match_where == 'mean':
-            matchphot = np.array(tdata).mean(axis=0)
+            matchphot = {k: phot[k].mean() for k in cols}
         else:
             raise ValueError("No valid match_where property set")
-        opt_pos = SkyCoord(matchphot[0], matchphot[1], unit="deg" )
+        opt_pos = SkyCoord(matchphot['ra'], matchphot['dec'], unit="deg" )
 
         # Retrieve match regions
         self.logger.info('Checking {} matches'.format(len(self.mm_list)) )
@@ -93,16 +96,16 @@ class T2MultiMessMatch(AbsLightCurveT2Unit):
         for mm_match in self.mm_list:
             self.logger.info('Checking MM alert {}'.format(mm_match['mm_ID']) )
             # Position
-            ang_diff = float( opt_pos.separation( SkyCoord( mm_match['ra'], mm_match['dec']) ) / u.deg )
-            ang_pull = ang_diff / float(mm_match['pos_error']/ u.deg ) * self.spatial_pull_scaling
+            ang_diff = float( opt_pos.separation( SkyCoord( mm_match['ra'], mm_match['dec']) ).deg )
+            ang_pull = ang_diff / mm_match['pos_error'].to_value('deg') * self.spatial_pull_scaling
             self.logger.info('Angular separtion {:.3f} with pull {:.2f}'.format(ang_diff,ang_pull) )
             # Time
-            t_diff = float( (Time(matchphot[2], format='jd')-mm_match['time']).jd )
-            t_pull = np.abs( t_diff ) / float(mm_match['time_error']/u.d ) * self.temporal_pull_scaling 
+            t_diff = float( matchphot['jd'] - mm_match['time'].jd )
+            t_pull = np.abs( t_diff ) / mm_match['time_error'].to_value('d') * self.temporal_pull_scaling 
             self.logger.info('Time separtion {:.3f} with pull {:.2f}'.format(t_diff,t_pull) )
             # Energy
-            e_diff = float( matchphot[3]-mm_match['ab_mag'] )
-            e_pull = np.abs(e_diff) / float(mm_match['ab_mag_errr'] * matchphot[4] ) * self.energy_pull_scaling 
+            e_diff = float( matchphot['magpsf']-mm_match['ab_mag'] )
+            e_pull = np.abs(e_diff) / float(mm_match['ab_mag_errr'] * matchphot['sigmapsf'] ) * self.energy_pull_scaling 
             self.logger.info('Energy separtion {:.3f} with pull {:.2f}'.format(e_diff,e_pull) )
             # Evaluate
             comb_pull = ang_pull * t_pull * e_pull
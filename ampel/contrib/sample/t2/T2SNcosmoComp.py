@@ -9,11 +9,12 @@
 
 from typing import Dict, List, Optional, Sequence, Any, Tuple
 import numpy as np
-import sncosmo
 from ampel.type import T2UnitResult
 from ampel.view.LightCurve import LightCurve
-from astropy.table import Table
 from ampel.abstract.AbsLightCurveT2Unit import AbsLightCurveT2Unit
+from ampel.contrib.sample.util.metrics import instrument
+from ampel.contrib.sample.util.photometry import get_photometry, zp
+from ampel.contrib.sample.util import mwebv
 
 
 
@@ -26,7 +27,8 @@ class T2SNcosmoComp(AbsLightCurveT2Unit):
     A fit quality test is also done.
 
     This class is still only rudimentary. In particular:
-    - MW or host galaxy reddening not accounted for!
+    - Host galaxy reddening not accounted for! MW reddening (SFD98 map, CCM89 dust law)
+      only if apply_mwebv is set, the SFD maps then have to be available (see util.mwebv).
     - All models assumed to be part of the standard SNcosmo registry.
     - Assumes input lightcurve contains AB magnitudes.
     - Model fit boundaries not propagated to fit.
@@ -51,16 +53,40 @@ class T2SNcosmoComp(AbsLightCurveT2Unit):
     chicomp_scaling: float = 1.
     # Redshift bound for template fit
     zbound: Tuple[float, float] = (0,0.2)
+    # Correct for Milky Way extinction
+    apply_mwebv: bool = False
+    # Directory of the SFD dust maps (default: SFD_DIR environment variable)
+    sfd_dir: Optional[str] = None
 
 
     def post_init(self)-> None:
         """
         Retrieve models.
         """
-        self.target_model = sncosmo.Model(source=self.target_model_name)
-        self.base_model = sncosmo.Model(source=self.base_model_name)
+        import sncosmo
+        if self.apply_mwebv:
+            # MW dust is fixed for each fit (not a free parameter)
+            self.target_model, self.base_model = (
+                sncosmo.Model(
+                    source=name, effects=[sncosmo.CCM89Dust()],
+                    effect_names=['mw'], effect_frames=['obs']
+                )
+                for name in (self.target_model_name, self.base_model_name)
+            )
+            # Open maps once for the whole process
+            mwebv.get_maps(self.sfd_dir)
+        else:
+            self.target_model = sncosmo.Model(source=self.target_model_name)
+            self.base_model = sncosmo.Model(source=self.base_model_name)
+        self.target_fit_params = [
+            p for p in self.target_model.param_names if p not in ('mwebv', 'mwr_v')
+        ]
+        self.base_fit_params = [
+            p for p in self.base_model.param_names if p not in ('mwebv', 'mwr_v')
+        ]
     
         
+    @instrument
     def run(self, light_curve: LightCurve) -> T2UnitResult:
         """
         Parameters
@@ -73,23 +99,41 @@ class T2SNcosmoComp(AbsLightCurveT2Unit):
         dict
         """
 
+        import sncosmo
+        from astropy.table import Table
+
         self.logger.info('Fitting %s'%(light_curve.stock_id) )
 
-        # Create SNCosmo input table
-        phot = np.asarray( light_curve.get_ntuples(('jd','magpsf','sigmapsf','fid')) )
-        phot_tab = Table(phot,names=('jd','magpsf','sigmapsf','fid'))
+        # Create SNCosmo input table (fluxes are computed by the shared photometry cache)
+        phot = get_photometry(light_curve)
+        phot = phot[phot['fid'] > 0]
+        phot_tab = Table(
+            {k: phot[k] for k in ('jd', 'magpsf', 'sigmapsf', 'fid', 'flux', 'fluxerr')}
+        )
         phot_tab['band'] = 'ztfband'
         for fid, fname in zip( [1,2,3], ['ztfg','ztfr','ztfi']):
             phot_tab['band'][phot_tab['fid']==fid] = fname
-        phot_tab['flux'] = 10 ** (-(phot_tab['magpsf'] - 25) / 2.5)
-        phot_tab['fluxerr'] = np.abs(phot_tab['flux'] * (-phot_tab['sigmapsf'] / 2.5 * np.log(10)))
-        phot_tab['zp'] = 25
+        phot_tab['zp'] = zp
         phot_tab['zpsys'] = 'ab'
+
+        # MW extinction at the (median) transient position
+        ebv = None
+        if self.apply_mwebv:
+            pos = np.isfinite(phot['ra']) & np.isfinite(phot['dec'])
+            ebv = 0.
+            if pos.any():
+                ebv = mwebv.ebv_at(
+                    float(np.median(phot['ra'][pos])), float(np.median(phot['dec'][pos])), self.sfd_dir
+                )
+            else:
+                self.logger.info("No position, MW extinction not corrected",extra={"stock_id":light_curve.stock_id})
+            self.base_model.set(mwebv=ebv)
+            self.target_model.set(mwebv=ebv)
         
         # Fit base match
         try:
             result, fitted_model = sncosmo.fit_lc(
-                phot_tab, self.base_model, self.base_model.param_names, bounds={'z':self.zbound})  
+                phot_tab, self.base_model, self.base_fit_params, bounds={'z':self.zbound})  
             chidof_base = result.chisq / result.ndof
         except RuntimeError:
             # We interpret a poor fit a a weird lightcurve, and exit
@@ -100,7 +144,7 @@ class T2SNcosmoComp(AbsLightCurveT2Unit):
         # Fit target source
         try:
             result, fitted_model = sncosmo.fit_lc(
-                phot_tab, self.target_model, self.target_model.param_names, bounds={'z':self.zbound}  )  
+                phot_tab, self.target_model, self.target_fit_params, bounds={'z':self.zbound}  )  
             chidof_target = result.chisq / result.ndof
         except RuntimeError:
             # We interpret a poor fit a a weird lightcurve, and exit
@@ -111,6 +155,8 @@ class T2SNcosmoComp(AbsLightCurveT2Unit):
         # Gather information to propagate / log
         fit_info = {'chidof_base':chidof_base,'chidof_target':chidof_target,
             'base_model':self.base_model_name, 'target_model':self.target_model_name}
+        if ebv is not None:
+            fit_info['mwebv'] = ebv
 
         # Crude decision made
         if chidof_target>self.chi2dof_cut:
@@ -7,12 +7,15 @@
 # Last Modified Date: 04.04.2021
 # Last Modified By  : jno 
 
+import hashlib
+import json
 from typing import Any, Dict, List, Optional, Tuple
 from ampel.abstract.AbsT3Unit import AbsT3Unit
 from ampel.struct.JournalTweak import JournalTweak
 from ampel.view.TransientView import TransientView
 from ampel.ztf.util.ZTFIdMapper import to_ampel_id, to_ztf_id
 from ampel.type import StockId
+from ampel.contrib.sample.util.metrics import instrument
 
 
 class T3HelloWorld(AbsT3Unit):
@@ -25,12 +28,23 @@ class T3HelloWorld(AbsT3Unit):
     All transients provided to this unit will trigger reactions. It is assumed that 
     selection and filtering has taken place in the T2 and through a
     T3FilteringStockSelector-like selection
+
+    If skip_unchanged is set, a fingerprint of the collected T2 info is stored in the
+    journal of each successful reaction, and transients whose fingerprint did not change
+    since then are skipped. Fingerprints are tagged with fingerprint_scope, such that
+    several processes running this unit on the same stocks do not suppress each other.
+    Incremental runs (only stocks updated recently) are configured in the process
+    selector, see sample_t3_process.yml.
     """
 
 
     # List of T2 unit names which should be collected for reaction
+    # (T2 documents of these units have to be loaded, see the process 'load' directives)
     t2info_from : List[str] = []
-
+    # Only react if the collected T2 info changed since the last successful reaction
+    skip_unchanged : bool = False
+    # Fingerprints of other scopes are ignored (use one scope per process running the unit)
+    fingerprint_scope : str = "T3HelloWorld"
 
 
     def react(
@@ -63,13 +77,38 @@ class T3HelloWorld(AbsT3Unit):
 
         for t2unit in self.t2info_from:
             t2_result = tran_view.get_t2_result(unit_id=t2unit)
-            if t2_result is not None:
-               info[t2unit] = t2_result
+            if t2_result is None:
+                # T2 not (yet) computed or not loaded (check the process load directives)
+                self.logger.info("No T2 result", extra={"tranId": tran_view.id, "unit": t2unit})
+                continue
+            info[t2unit] = t2_result
         return info
 
 
+    def get_fingerprint(self, info: Dict[str, Any]) -> str:
+        """
+        Hash of the information dict (insensitive to key ordering).
+        """
+        return hashlib.blake2b(
+            json.dumps(info, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
 
 
+    def get_last_fingerprint(self, tran_view: TransientView) -> Optional[str]:
+        """
+        Fingerprint recorded by the last successful reaction of this scope, if any.
+        """
+        for jentry in reversed(tran_view.get_journal_entries(tier=3) or []):
+            extra = jentry.get("extra") or {}
+            if (
+                extra.get("success") and "fingerprint" in extra and
+                extra.get("scope") == self.fingerprint_scope
+            ):
+                return extra["fingerprint"]
+        return None
+
+
+    @instrument
     def add(self, transients) -> Dict[StockId, JournalTweak]:
         """
         Loop through transients and check for TNS names and/or candidates to submit.
@@ -86,10 +125,20 @@ class T3HelloWorld(AbsT3Unit):
             transientinfo = self.collect_info(tv)
             self.logger.info("Recieved", extra={"tranId": tv.id})
 
+            # Nothing changed since the last reaction
+            if self.skip_unchanged:
+                fingerprint = self.get_fingerprint(transientinfo)
+                if fingerprint == self.get_last_fingerprint(tv):
+                    self.logger.info("Unchanged, skipping", extra={"tranId": tv.id})
+                    continue
+
             # A reaction method is executed for each transient
             success, jcontent = self.react(tv, transientinfo)
                 
             if jcontent is not None:
+                if self.skip_unchanged:
+                    jcontent["fingerprint"] = fingerprint
+                    jcontent["scope"] = self.fingerprint_scope
                 jup = JournalTweak(extra=jcontent)
                 journal_updates[tv.id] = jup
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/t3/T3T2ParquetExporter.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+import time
+from typing import Any, Dict, List, Optional
+from ampel.view.TransientView import TransientView
+from ampel.abstract.AbsT3Unit import AbsT3Unit
+from ampel.struct.JournalTweak import JournalTweak
+from ampel.type import StockId
+
+
+class T3T2ParquetExporter(AbsT3Unit):
+    """
+    Export T2 results of the provided transients into a partitioned Parquet dataset
+    (see ampel.contrib.sample.util.t2parquet), which can be queried offline, e.g.:
+
+        from pyarrow.dataset import field
+        from ampel.contrib.sample.util.t2parquet import query
+        query(base_dir, "T2MultiMessMatch", field("best_match") < 1, ["stock", "best_match"])
+
+    Each run appends new files, such that the unit can be scheduled regularly
+    over a season. Only T2 results computed after the latest one already exported for
+    a given stock are written: the rows store the time of the T2 result (T2 document
+    body), not the export time. Requires pyarrow (extra 'export').
+    """
+
+    # Root directory of the dataset
+    base_dir: str
+    # T2 units to export
+    t2units: List[str] = ["T2SNcosmoComp", "T2MultiMessMatch"]
+    # Per unit, list of dicts to be exploded into one row per entry
+    explode: Dict[str, str] = {"T2MultiMessMatch": "matches"}
+    # Number of rows (per unit) buffered before being written
+    buffer_size: int = 50000
+
+
+    def post_init(self) -> None:
+        """ """
+        from ampel.contrib.sample.util import t2parquet
+        self.t2parquet = t2parquet
+        self.rows: Dict[str, List[Dict[str, Any]]] = {unit: [] for unit in self.t2units}
+        # Time of the latest exported result per unit and stock
+        self.last: Dict[str, Dict[Any, float]] = {
+            unit: t2parquet.last_export(self.base_dir, unit) for unit in self.t2units
+        }
+        self.ts = time.time()
+        self.n_unknown_time = 0
+
+
+    def get_t2_time(self, tran_view: TransientView, unit: str) -> Optional[float]:
+        """
+        Latest update time of the loaded T2 documents of unit (timestamps of their
+        body entries), None if unknown.
+        """
+        ts = [
+            el["ts"]
+            for t2_view in tran_view.t2 or []
+            if t2_view.unit == unit
+            for el in t2_view.body or []
+            if isinstance(el, dict) and "ts" in el
+        ]
+        return max(ts) if ts else None
+
+
+    def add(self, transients) -> Optional[Dict[StockId, JournalTweak]]:
+        """
+        Convert T2 results into table rows.
+        """
+
+        for tv in transients:
+            for unit in self.t2units:
+                t2_result = tv.get_t2_result(unit_id=unit)
+                if t2_result is None:
+                    continue
+                ts = self.get_t2_time(tv, unit)
+                if ts is None:
+                    # Exported with the current time (and thus again in later runs)
+                    self.n_unknown_time += 1
+                    ts = self.ts
+                elif ts <= self.last[unit].get(tv.id, -1):
+                    continue
+                self.last[unit][tv.id] = ts
+                self.rows[unit].extend(
+                    self.t2parquet.to_rows(tv.id, unit, t2_result, ts, self.explode.get(unit))
+                )
+                if len(self.rows[unit]) >= self.buffer_size:
+                    self.flush(unit)
+
+        return None
+
+
+    def flush(self, unit: str) -> None:
+        """ Write buffered rows of unit """
+        if self.rows[unit]:
+            self.t2parquet.write_rows(self.rows[unit], self.base_dir, unit)
+            self.logger.info("Exported", extra={"unit": unit, "rows": len(self.rows[unit])})
+            self.rows[unit] = []
+
+
+    def done(self) -> None:
+        """ """
+        for unit in self.t2units:
+            self.flush(unit)
+        if self.n_unknown_time:
+            self.logger.info("T2 result time unknown", extra={"count": self.n_unknown_time})
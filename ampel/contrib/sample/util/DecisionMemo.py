@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/DecisionMemo.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+import atexit, hashlib, json, math, os, weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from ampel.contrib.sample.util.files import atomic_write
+
+# Memo saved at exit for each path (the latest one created for a given path)
+_exit_memos: "weakref.WeakValueDictionary[str, DecisionMemo]" = weakref.WeakValueDictionary()
+
+
+class DecisionMemo:
+	"""
+	Bounded (LRU) memo of filter decisions which only depend on the transient position,
+	keyed by stock id. A memoized decision is reused if the position is within
+	'tolerance' [arcsec] of the position it was computed for (otherwise it is recomputed),
+	such that repeated alerts of a stock can skip these checks.
+
+	The memo can be persisted to a json file, saved by checkpoint() (which filters
+	call every 'checkpoint_every' lookups, see checkpoint_due()) and at exit.
+	As exit handlers do not run if the process is killed by a signal, the periodic
+	checkpoints bound the loss. It is tagged with a hash of the filter config: a memo
+	created with another config is discarded when loaded.
+
+	Several processes can share a file: save() merges the entries of the file with
+	its own ones. The merge is not locked, entries added by another process between
+	the read and the replacement of the file are lost (and recomputed later).
+	"""
+
+	def __init__(
+		self, config: Dict[str, Any], max_size: int = 100000,
+		tolerance: float = 1., path: Optional[str] = None, checkpoint_every: int = 1000
+	) -> None:
+
+		self.max_size = max_size
+		self.tolerance = tolerance
+		self.path = path
+		self.checkpoint_every = checkpoint_every
+		self.config_hash = hashlib.sha1(
+			json.dumps({**config, "tolerance": tolerance}, sort_keys=True, default=str).encode()
+		).hexdigest()
+		# stock -> (ra, dec, decision)
+		self.memo: "OrderedDict[Any, Tuple[float, float, Any]]" = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+		self.invalidated = False
+
+		if path:
+			self.load()
+			_exit_memos[path] = self
+
+
+	def is_close(self, ra: float, dec: float, ra_ref: float, dec_ref: float) -> bool:
+		""" Whether the positions [deg] are within tolerance (small angle approximation) """
+		dra = ((ra - ra_ref + 180.) % 360. - 180.) * math.cos(math.radians(dec))
+		return math.hypot(dra, dec - dec_ref) * 3600. <= self.tolerance
+
+
+	def get_or_compute(self, stock: Any, ra: float, dec: float, func: Callable[[], Any]) -> Any:
+		"""
+		Memoized result for this stock and position, computed with func() if missing
+		or computed for another position.
+		"""
+		if stock in self.memo:
+			ra_ref, dec_ref, value = self.memo[stock]
+			if self.is_close(ra, dec, ra_ref, dec_ref):
+				self.hits += 1
+				self.memo.move_to_end(stock)
+				return value
+
+		self.misses += 1
+		value = func()
+		self.memo[stock] = (ra, dec, value)
+		self.memo.move_to_end(stock)
+		if len(self.memo) > self.max_size:
+			self.memo.popitem(last=False)
+		return value
+
+
+	def stats(self) -> Dict[str, Any]:
+		""" Hit/miss statistics """
+		n = self.hits + self.misses
+		return {
+			"hits": self.hits, "misses": self.misses,
+			"hitRate": self.hits / n if n else 0., "size": len(self.memo)
+		}
+
+
+	def checkpoint_due(self) -> bool:
+		""" Whether checkpoint() should be called (every checkpoint_every lookups) """
+		n = self.hits + self.misses
+		return self.checkpoint_every > 0 and n > 0 and n % self.checkpoint_every == 0
+
+
+	def checkpoint(self) -> Dict[str, Any]:
+		""" Persist memo (if a path is set) and return statistics, for logging """
+		self.save()
+		return self.stats()
+
+
+	def read(self) -> "Optional[OrderedDict[Any, Tuple[float, float, Any]]]":
+		"""
+		Entries of the file (least recently used first), None if it was created
+		with another config
+		"""
+		entries: "OrderedDict[Any, Tuple[float, float, Any]]" = OrderedDict()
+		if not (self.path and os.path.exists(self.path)):
+			return entries
+		with open(self.path) as f:
+			doc = json.load(f)
+		if doc.get("config") != self.config_hash:
+			return None
+		for stock, ra, dec, value in doc["memo"][-self.max_size:]:
+			entries[stock] = (ra, dec, value)
+		return entries
+
+
+	def load(self) -> None:
+		""" Load persisted memo, unless created with a different config """
+		entries = self.read()
+		if entries is None:
+			self.invalidated = True
+		else:
+			self.memo = entries
+
+
+	def save(self) -> None:
+		"""
+		Persist memo (atomically replacing the previous file), merged with the entries
+		of the file which are not in memory (ex: saved by another process)
+		"""
+		if not self.path:
+			return
+		merged = self.read() or OrderedDict()
+		for stock in self.memo:
+			merged.pop(stock, None)
+		merged.update(self.memo)
+		while len(merged) > self.max_size:
+			merged.popitem(last=False)
+		atomic_write(
+			self.path,
+			json.dumps({
+				"config": self.config_hash,
+				"memo": [[stock, *entry] for stock, entry in merged.items()]
+			})
+		)
+
+
+def _save_at_exit() -> None:
+	for memo in list(_exit_memos.values()):
+		memo.save()
+
+
+# Single exit handler, which only holds weak references to the memos
+atexit.register(_save_at_exit)
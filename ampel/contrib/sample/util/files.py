@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/files.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+import os, tempfile
+
+
+def atomic_write(path: str, content: str) -> None:
+	"""
+	Replace the content of path atomically. The temporary file has a unique name
+	(in the same directory), such that several processes can safely write the same path.
+	"""
+	fd, tmp_path = tempfile.mkstemp(
+		dir=os.path.dirname(os.path.abspath(path)),
+		prefix=os.path.basename(path) + ".", suffix=".tmp"
+	)
+	try:
+		with os.fdopen(fd, "w") as f:
+			f.write(content)
+		os.replace(tmp_path, path)
+	except BaseException:
+		os.unlink(tmp_path)
+		raise
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/metrics.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+"""
+Opt-in instrumentation of unit methods (T0 apply, T2 run, T3 add).
+
+Enabled through environment variables, evaluated when the unit modules are imported:
+
+- AMPEL_SAMPLE_METRICS: path of the Prometheus text file with per unit and method
+  latency histograms. '{pid}' is replaced by the process id.
+- AMPEL_SAMPLE_PROFILE: number N of slowest calls (per unit and method) for which
+  cProfile stats are kept and dumped into AMPEL_SAMPLE_PROFILE_DIR
+  (default: current directory). Profiling every call is costly, use for captures only.
+- AMPEL_SAMPLE_PROFILE_FLAG: path of a flag file enabling on-demand captures: calls
+  are only profiled while this file exists (N defaults to 10), such that profiling
+  can be switched on and off without restarting the workers.
+- AMPEL_SAMPLE_FLUSH_INTERVAL: the metrics file and profiles are written every this
+  many seconds (default: 60), when an instrumented method is called, and at exit.
+  The flag file is checked at the same interval.
+
+If none of the first three is set, @instrument returns the decorated method
+unchanged (no overhead).
+"""
+
+import atexit, cProfile, heapq, os, time
+from bisect import bisect_left
+from functools import wraps
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from ampel.contrib.sample.util.files import atomic_write
+
+F = TypeVar("F", bound=Callable)
+
+metrics_file: Optional[str] = os.environ.get("AMPEL_SAMPLE_METRICS")
+profile_flag: Optional[str] = os.environ.get("AMPEL_SAMPLE_PROFILE_FLAG")
+profile_top: int = int(os.environ.get("AMPEL_SAMPLE_PROFILE", 10 if profile_flag else 0))
+profile_dir: str = os.environ.get("AMPEL_SAMPLE_PROFILE_DIR", ".")
+flush_interval: float = float(os.environ.get("AMPEL_SAMPLE_FLUSH_INTERVAL", 60))
+
+enabled: bool = bool(metrics_file or profile_top)
+# Whether calls are currently profiled (updated from the flag file, if any)
+profiling: bool = bool(profile_top) and not profile_flag
+_next_flush: float = 0.
+
+# Upper bounds [s] of the histogram buckets (+Inf is implicit)
+buckets: Tuple[float, ...] = (
+	0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30.
+)
+
+
+class Histogram:
+	""" Latency histogram with fixed buckets """
+
+	def __init__(self) -> None:
+		self.counts = [0] * (len(buckets) + 1)
+		self.sum = 0.
+		self.count = 0
+
+	def observe(self, value: float) -> None:
+		self.counts[bisect_left(buckets, value)] += 1
+		self.sum += value
+		self.count += 1
+
+
+histograms: Dict[Tuple[str, str], Histogram] = {}
+
+# Min-heaps of (duration, tie breaker, profile) of the slowest calls
+profiles: Dict[Tuple[str, str], List[Tuple[float, int, cProfile.Profile]]] = {}
+_tie = count()
+
+
+def instrument(method: F) -> F:
+	"""
+	Decorator recording the latency of a unit method
+	"""
+	if not enabled:
+		return method
+
+	name = method.__name__
+
+	@wraps(method)
+	def wrapper(self, *args, **kwargs):
+		if time.monotonic() >= _next_flush:
+			flush()
+		key = (type(self).__name__, name)
+		if profiling:
+			prof = cProfile.Profile()
+			t = time.perf_counter()
+			try:
+				return prof.runcall(method, self, *args, **kwargs)
+			finally:
+				dt = time.perf_counter() - t
+				observe(key, dt)
+				heap = profiles.setdefault(key, [])
+				if len(heap) < profile_top:
+					heapq.heappush(heap, (dt, next(_tie), prof))
+				elif dt > heap[0][0]:
+					heapq.heapreplace(heap, (dt, next(_tie), prof))
+		t = time.perf_counter()
+		try:
+			return method(self, *args, **kwargs)
+		finally:
+			observe(key, time.perf_counter() - t)
+
+	return wrapper # type: ignore[return-value]
+
+
+def observe(key: Tuple[str, str], value: float) -> None:
+	if key not in histograms:
+		histograms[key] = Histogram()
+	histograms[key].observe(value)
+
+
+def to_prometheus() -> str:
+	""" Histograms in the Prometheus text exposition format """
+	lines = [
+		"# HELP ampel_unit_call_seconds Latency of unit method calls",
+		"# TYPE ampel_unit_call_seconds histogram"
+	]
+	for (unit, method), h in sorted(histograms.items()):
+		labels = f'unit="{unit}",method="{method}"'
+		cumulated = 0
+		for le, c in zip([*map(repr, buckets), "+Inf"], h.counts):
+			cumulated += c
+			lines.append(f'ampel_unit_call_seconds_bucket{{{labels},le="{le}"}} {cumulated}')
+		lines.append(f"ampel_unit_call_seconds_sum{{{labels}}} {h.sum}")
+		lines.append(f"ampel_unit_call_seconds_count{{{labels}}} {h.count}")
+	return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str) -> None:
+	""" Write histograms (atomically replacing an existing file) """
+	atomic_write(path.format(pid=os.getpid()), to_prometheus())
+
+
+def dump_profiles(out_dir: str) -> List[str]:
+	""" Dump kept profiles (slowest first, replacing previous dumps), returns file paths """
+	paths = []
+	for (unit, method), heap in profiles.items():
+		for rank, (dt, _, prof) in enumerate(sorted(heap, key=lambda x: -x[0])):
+			paths.append(
+				os.path.join(out_dir, f"{unit}.{method}.{os.getpid()}.{rank}.prof")
+			)
+			# file names are unique per process
+			prof.dump_stats(paths[-1] + ".tmp")
+			os.replace(paths[-1] + ".tmp", paths[-1])
+	return paths
+
+
+def flush() -> None:
+	"""
+	Write metrics and profiles, update the profiling state from the flag file.
+	Called periodically (flush_interval) by instrumented methods and at exit.
+	"""
+	global _next_flush, profiling
+	_next_flush = time.monotonic() + flush_interval
+	if profile_flag:
+		profiling = os.path.exists(profile_flag)
+	if metrics_file and histograms:
+		write_prometheus(metrics_file)
+	if profiles:
+		dump_profiles(profile_dir)
+
+
+if enabled:
+	atexit.register(flush)
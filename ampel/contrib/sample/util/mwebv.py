@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/mwebv.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+"""
+Milky Way E(B-V) from the Schlegel, Finkbeiner & Davis (1998) dust maps.
+
+Uses the map files of sfdmap (SFD_dust_4096_ngp.fits, SFD_dust_4096_sgp.fits), located
+in the provided directory or in the one set by the SFD_DIR environment variable.
+The maps are not shipped with sfdmap, they can be obtained from
+https://github.com/kbarbary/sfddata (as documented by sfdmap).
+Contrary to sfdmap, the maps are memory-mapped (and never modified): they are opened
+once per process, only the pages around the requested positions are read and these
+are shared through the OS page cache by all workers of a host.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# Schlafly & Finkbeiner (2011) recalibration, as in sfdmap
+scaling: float = 0.86
+
+# Positions are rounded to this number of decimals [deg] before being cached
+# (the map pixel size is ~2.4 arcmin)
+cache_decimals: int = 3
+
+
+class SFDHemisphere:
+	""" Lambert (ZEA) projected map of one galactic hemisphere """
+
+	def __init__(self, path: str) -> None:
+		from astropy.io import fits
+		self.hdul = fits.open(path, memmap=True)
+		self.data = self.hdul[0].data
+		header = self.hdul[0].header
+		self.crpix1 = header["CRPIX1"]
+		self.crpix2 = header["CRPIX2"]
+		self.lam_scal = header["LAM_SCAL"]
+		self.sign = header["LAM_NSGP"] # 1: north, -1: south
+
+
+	def ebv(self, l: np.ndarray, b: np.ndarray) -> np.ndarray:
+		""" Bilinear interpolation at galactic coordinates l, b [rad] (unscaled) """
+
+		r = self.lam_scal * np.sqrt(1. - self.sign * np.sin(b))
+		x = self.crpix1 - 1. + r * np.cos(l)
+		y = self.crpix2 - 1. - self.sign * r * np.sin(l)
+
+		x0, y0 = np.floor(x), np.floor(y)
+		xw, yw = x - x0, y - y0
+		ny, nx = self.data.shape
+		x0i = np.clip(x0.astype(int), 0, nx - 1)
+		x1i = np.clip(x0i + 1, 0, nx - 1)
+		y0i = np.clip(y0.astype(int), 0, ny - 1)
+		y1i = np.clip(y0i + 1, 0, ny - 1)
+
+		return (
+			self.data[y0i, x0i] * (1 - xw) * (1 - yw) +
+			self.data[y1i, x0i] * (1 - xw) * yw +
+			self.data[y0i, x1i] * xw * (1 - yw) +
+			self.data[y1i, x1i] * xw * yw
+		)
+
+
+_maps: Dict[str, Tuple[SFDHemisphere, SFDHemisphere]] = {}
+
+
+def get_maps(mapdir: Optional[str] = None) -> Tuple[SFDHemisphere, SFDHemisphere]:
+	""" North and south hemisphere maps, opened on first call """
+	if mapdir is None:
+		mapdir = os.environ.get("SFD_DIR")
+		if mapdir is None:
+			raise ValueError("No SFD map directory provided and SFD_DIR not set")
+	if mapdir not in _maps:
+		_maps[mapdir] = (
+			SFDHemisphere(os.path.join(mapdir, "SFD_dust_4096_ngp.fits")),
+			SFDHemisphere(os.path.join(mapdir, "SFD_dust_4096_sgp.fits"))
+		)
+	return _maps[mapdir]
+
+
+def get_ebv(ra, dec, mapdir: Optional[str] = None) -> np.ndarray:
+	"""
+	E(B-V) at the (ICRS) positions ra, dec [deg], scalar or arrays
+	"""
+	from astropy.coordinates import SkyCoord
+	gal = SkyCoord(np.atleast_1d(ra), np.atleast_1d(dec), unit="deg", frame="icrs").galactic
+	l, b = gal.l.rad, gal.b.rad
+	north, south = get_maps(mapdir)
+
+	ebv = np.empty(len(l))
+	n = b >= 0
+	ebv[n] = north.ebv(l[n], b[n])
+	ebv[~n] = south.ebv(l[~n], b[~n])
+	return scaling * ebv
+
+
+def ebv_at(ra: float, dec: float, mapdir: Optional[str] = None) -> float:
+	"""
+	E(B-V) at a single position, cached (repeated fits of the same transient)
+	"""
+	return _ebv_at(round(ra, cache_decimals), round(dec, cache_decimals), mapdir)
+
+
+@lru_cache(maxsize=4096)
+def _ebv_at(ra: float, dec: float, mapdir: Optional[str]) -> float:
+	return float(get_ebv(ra, dec, mapdir)[0])
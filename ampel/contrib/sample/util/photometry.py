@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/photometry.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple, TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+	from ampel.view.LightCurve import LightCurve
+
+# ZTF magnitudes are AB, fluxes are computed with this zero point
+zp: float = 25.
+
+dtype = np.dtype([
+	("jd", "f8"), ("magpsf", "f8"), ("sigmapsf", "f8"), ("fid", "i4"),
+	("ra", "f8"), ("dec", "f8"), ("flux", "f8"), ("fluxerr", "f8")
+])
+
+# Number of light curves kept. T2 documents of a given compound are usually
+# processed close to each other, a small cache is thus enough.
+cache_size: int = 256
+
+_cache: "OrderedDict[Tuple[Any, Hashable], np.ndarray]" = OrderedDict()
+
+
+def get_photometry(light_curve: "LightCurve") -> np.ndarray:
+	"""
+	Photopoints of a light curve as a read-only numpy structured array (see dtype),
+	sorted by jd, shared by all units processing the same light curve (compound).
+
+	Photopoints without jd, magpsf or sigmapsf are skipped, a missing fid is set to 0,
+	missing ra/dec to nan.
+	"""
+	key = (light_curve.stock_id, light_curve.compound_id)
+	if key in _cache:
+		_cache.move_to_end(key)
+		return _cache[key]
+
+	phot = build_photometry(light_curve)
+	_cache[key] = phot
+	if len(_cache) > cache_size:
+		_cache.popitem(last=False)
+	return phot
+
+
+def build_photometry(light_curve: "LightCurve") -> np.ndarray:
+	""" Uncached version of get_photometry """
+
+	rows = []
+	for pp in light_curve.photopoints or []:
+		body = pp["body"]
+		if body.get("jd") is None or body.get("magpsf") is None or body.get("sigmapsf") is None:
+			continue
+		rows.append((
+			body["jd"], body["magpsf"], body["sigmapsf"],
+			body.get("fid") or 0,
+			np.nan if body.get("ra") is None else body["ra"],
+			np.nan if body.get("dec") is None else body["dec"],
+			0., 0.
+		))
+
+	phot = np.array(rows, dtype=dtype)
+	phot.sort(order="jd")
+	phot["flux"] = 10 ** (-(phot["magpsf"] - zp) / 2.5)
+	phot["fluxerr"] = np.abs(phot["flux"] * phot["sigmapsf"] * np.log(10) / 2.5)
+	phot.flags.writeable = False
+	return phot
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/contrib/sample/util/t2parquet.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+"""
+Columnar (Parquet) storage of T2 results for offline analysis.
+
+Results are stored per T2 unit under <base_dir>/<unit>/, partitioned by the night of
+the T2 result (hive style: night=YYYYMMDD). Each row carries the time 'ts' of its T2
+result. Nested result fields are flattened ('_' separated), one list of dicts per unit
+(ex: 'matches' of T2MultiMessMatch) can be exploded into one row per entry.
+Each export adds new files, existing files are never rewritten: exports only include
+results newer than the ones already stored (see last_export).
+
+Example::
+
+	from pyarrow.dataset import field
+	stocks = select_stocks(
+		"t2export", {
+			"T2SNcosmoComp": field("target_match") == True,
+			"T2MultiMessMatch": field("best_match") < 1
+		}
+	)
+"""
+
+import json, os, time
+from uuid import uuid4
+from typing import Any, Dict, List, Optional, Sequence, Set
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+partitioning = ds.partitioning(pa.schema([("night", pa.string())]), flavor="hive")
+
+
+def flatten(doc: Dict[str, Any], prefix: str = "", sep: str = "_") -> Dict[str, Any]:
+	"""
+	Flatten nested dicts. Numbers are stored as floats (result fields such as
+	'chidof_base' can be either int or float), lists of scalars are kept as such
+	and other lists are json encoded.
+	"""
+	out: Dict[str, Any] = {}
+	for k, v in doc.items():
+		key = f"{prefix}{sep}{k}" if prefix else k
+		if isinstance(v, dict):
+			out.update(flatten(v, key, sep))
+		elif isinstance(v, (list, tuple)):
+			if all(isinstance(el, (int, float)) and not isinstance(el, bool) for el in v):
+				out[key] = [float(el) for el in v]
+			elif all(isinstance(el, (str, bool)) for el in v) and len(set(map(type, v))) < 2:
+				out[key] = list(v)
+			else:
+				out[key] = json.dumps(v, default=str)
+		elif isinstance(v, int) and not isinstance(v, bool):
+			out[key] = float(v)
+		else:
+			out[key] = v
+	return out
+
+
+def to_rows(
+	stock: Any, unit: str, result: Dict[str, Any],
+	ts: Optional[float] = None, explode: Optional[str] = None
+) -> List[Dict[str, Any]]:
+	"""
+	Convert a T2 result into table rows, one per entry of the (optional) explode field.
+
+	:param ts: time of the T2 result (default: now)
+	"""
+	base = {"stock": stock, "unit": unit, "ts": time.time() if ts is None else ts}
+	entries = result.get(explode) if explode else None
+	if not isinstance(entries, list):
+		base.update(flatten(result))
+		return [base]
+
+	base.update(flatten({k: v for k, v in result.items() if k != explode}))
+	if not entries:
+		return [base]
+	return [
+		{**base, f"{explode}_idx": i, **flatten(entry, explode)}
+		for i, entry in enumerate(entries)
+	]
+
+
+def write_rows(rows: Sequence[Dict[str, Any]], base_dir: str, unit: str) -> None:
+	"""
+	Append rows (of a single unit) to the dataset of this unit.
+	"""
+	if not rows:
+		return
+	# Rows may have different keys (ex: failed fits lack 'target_match'),
+	# the schema is built from all of them
+	keys = list(dict.fromkeys(k for r in rows for k in r))
+	table = pa.Table.from_pylist([{k: r.get(k) for k in keys} for r in rows])
+	table = table.append_column(
+		"night", pa.array([time.strftime("%Y%m%d", time.gmtime(r["ts"])) for r in rows])
+	)
+	pq.write_to_dataset(
+		table, os.path.join(base_dir, unit),
+		partitioning=partitioning,
+		basename_template=f"part-{uuid4().hex}-{{i}}.parquet"
+	)
+
+
+def get_dataset(base_dir: str, unit: str) -> ds.Dataset:
+	"""
+	Dataset of a given unit. Files may have different columns (fields missing in
+	a given export), their schemas are unified.
+	"""
+	path = os.path.join(base_dir, unit)
+	dset = ds.dataset(path, format="parquet", partitioning=partitioning)
+	schema = pa.unify_schemas(
+		[frag.physical_schema for frag in dset.get_fragments()] + [dset.schema]
+	)
+	return ds.dataset(path, format="parquet", partitioning=partitioning, schema=schema)
+
+
+def last_export(base_dir: str, unit: str) -> Dict[Any, float]:
+	"""
+	Time of the latest exported result of each stock (empty if nothing was exported).
+	Only the stock and ts columns are read.
+	"""
+	if not os.path.isdir(os.path.join(base_dir, unit)):
+		return {}
+	last = get_dataset(base_dir, unit).to_table(columns=["stock", "ts"]) \
+		.group_by("stock").aggregate([("ts", "max")])
+	return dict(zip(last.column("stock").to_pylist(), last.column("ts_max").to_pylist()))
+
+
+def query(
+	base_dir: str, unit: str,
+	filter: Optional[ds.Expression] = None,
+	columns: Optional[Sequence[str]] = None,
+	latest: bool = True
+) -> pa.Table:
+	"""
+	Load rows of a unit matching the filter expression, which is pushed down to the
+	parquet reader (partition and row group statistics).
+
+	:param latest: only consider the latest result of each stock
+	"""
+	dset = get_dataset(base_dir, unit)
+	cols = None if columns is None else list(dict.fromkeys(["stock", "ts", *columns]))
+	table = dset.to_table(filter=filter, columns=cols)
+
+	if latest:
+		last = dset.to_table(columns=["stock", "ts"]) \
+			.group_by("stock").aggregate([("ts", "max")])
+		table = table.join(
+			last, keys=["stock", "ts"], right_keys=["stock", "ts_max"], join_type="inner"
+		)
+
+	if columns is not None:
+		table = table.select(list(columns))
+	return table
+
+
+def select_stocks(
+	base_dir: str, filters: Dict[str, Optional[ds.Expression]], latest: bool = True
+) -> Set[Any]:
+	"""
+	Stocks fulfilling the filter expressions of all provided units.
+	"""
+	stocks: Optional[Set[Any]] = None
+	for unit, expr in filters.items():
+		s = set(query(base_dir, unit, expr, ["stock"], latest).column("stock").to_pylist())
+		stocks = s if stocks is None else stocks & s
+	return stocks or set()
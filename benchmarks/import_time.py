@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : benchmarks/import_time.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+"""
+Import time budget of the units registered in conf/ampel-contrib-sample/unit.yml.
+
+Each unit module is imported in a fresh interpreter (after the ampel base classes,
+which every worker loads anyway). The check fails if the import exceeds the budget,
+or if it pulls in one of the heavy dependencies, which units should only import
+on first use. Usage: python benchmarks/import_time.py [--budget 0.2]
+(also run by tests/test_import_time.py)
+"""
+
+import os, subprocess, sys
+from argparse import ArgumentParser
+
+unit_file = os.path.join(
+	os.path.dirname(__file__), "..", "conf", "ampel-contrib-sample", "unit.yml"
+)
+
+baseline = (
+	"ampel.abstract.AbsAlertFilter",
+	"ampel.abstract.AbsLightCurveT2Unit",
+	"ampel.abstract.AbsT3Unit",
+)
+
+heavy = (
+	"sncosmo", "iminuit", "astropy.coordinates", "astropy.table",
+	"astropy.time", "catsHTM", "sfdmap", "pyarrow",
+)
+
+code = """
+import importlib, sys, time
+for mod in {baseline!r}:
+	importlib.import_module(mod)
+t = time.perf_counter()
+importlib.import_module({module!r})
+print(time.perf_counter() - t)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(module: str, repeat: int = 3):
+	""" Returns min import time [s] and loaded heavy modules """
+	times = []
+	for i in range(repeat):
+		out = subprocess.run(
+			[sys.executable, "-c", code.format(baseline=baseline, module=module, heavy=heavy)],
+			check=True, capture_output=True, text=True
+		).stdout.splitlines()
+		times.append(float(out[0]))
+	return min(times), [m for m in out[1].split(",") if m]
+
+
+def get_modules():
+	""" Unit modules registered in unit.yml """
+	with open(unit_file) as f:
+		return [l[1:].strip() for l in f if l.startswith("-")]
+
+
+def main() -> int:
+
+	parser = ArgumentParser(description=__doc__.split("\n")[1])
+	parser.add_argument("--budget", type=float, default=0.2, help="max import time per unit [s]")
+	parser.add_argument("--repeat", type=int, default=3)
+	args = parser.parse_args()
+
+	failed = False
+	for module in get_modules():
+		dt, loaded = measure(module, args.repeat)
+		ok = dt <= args.budget and not loaded
+		failed |= not ok
+		print(
+			f"{'OK  ' if ok else 'FAIL'} {module:<55} {dt*1000:8.1f} ms" +
+			(f"  heavy imports: {', '.join(loaded)}" if loaded else "")
+		)
+
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
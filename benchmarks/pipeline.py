@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : benchmarks/pipeline.py
+# License           : BSD-3-Clause
+# Author            : agent <agent@local>
+# Date              : 19.10.2026
+# Last Modified Date: 19.10.2026
+# Last Modified By  : agent <agent@local>
+
+"""
+Unit-level benchmark of the units of a channel (default: SAMPLE_CHANNEL), per tier.
+
+The T0 filter, T2 and T3 units configured in the channel are called directly: no
+database or alert stream is needed. Alerts are read from a local tarball, T2 results
+and journal entries are kept in memory, and T3 units receive lightweight views
+providing the TransientView methods used by the sample units. The bundled
+t2/lightcurve.pickle is always added as one extra light curve.
+The framework stages (alert processor and ingestion, T2 processor, T3 selector and
+loader) are not run: their cost is not part of the results.
+
+For each tier, the number of calls (T3: one add call per unit and run, with all
+selected transients as in production), throughput, latency percentiles, and the peak
+resident memory during the tier and its increase over the tier start are reported.
+Timings are not traced, memory is sampled by a background thread (linux only).
+
+No alert tarball is bundled: without --alerts, T0 is skipped and T2/T3 only process
+the single pickled light curve, which is a smoke test rather than a measurement.
+Latency budgets (--max-p99 t2=500) therefore require --alerts with a representative
+alert sample.
+
+Usage: python benchmarks/pipeline.py --alerts ztfpub_200917_pruned.tar.gz
+"""
+
+import io, json, os, pickle, sys, threading, time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from importlib import import_module
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import yaml
+
+conf_dir = os.path.join(os.path.dirname(__file__), "..", "conf", "ampel-contrib-sample")
+pickle_file = os.path.join(
+	os.path.dirname(__file__), "..", "ampel", "contrib", "sample", "t2", "lightcurve.pickle"
+)
+
+
+def get_rss() -> int:
+	""" Current resident memory of the process [bytes], 0 if unknown (not linux) """
+	try:
+		with open("/proc/self/statm") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except OSError:
+		return 0
+
+
+class TierStats:
+	"""
+	Latencies of the unit calls of one tier, peak RSS during the tier and its increase
+	over the RSS at the tier start (sampled every 'interval' seconds)
+	"""
+
+	def __init__(self, tier: str, interval: float = 0.005) -> None:
+		self.tier = tier
+		self.latencies: List[float] = []
+		self.wall = 0.
+		self.interval = interval
+		self.start_rss = self.peak_rss = 0
+		self.stop = threading.Event()
+
+	def sample(self) -> None:
+		while not self.stop.wait(self.interval):
+			self.peak_rss = max(self.peak_rss, get_rss())
+
+	def __enter__(self) -> "TierStats":
+		self.start_rss = self.peak_rss = get_rss()
+		self.sampler = threading.Thread(target=self.sample, daemon=True)
+		self.sampler.start()
+		self.t0 = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc) -> None:
+		self.wall = time.perf_counter() - self.t0
+		self.stop.set()
+		self.sampler.join()
+		self.peak_rss = max(self.peak_rss, get_rss())
+
+	def call(self, func: Callable, *args) -> Any:
+		t = time.perf_counter()
+		ret = func(*args)
+		self.latencies.append(time.perf_counter() - t)
+		return ret
+
+	def percentile(self, q: float) -> float:
+		if not self.latencies:
+			return 0.
+		lat = sorted(self.latencies)
+		return lat[min(len(lat) - 1, int(round(q / 100 * (len(lat) - 1))))]
+
+	def summary(self) -> Dict[str, Any]:
+		return {
+			"tier": self.tier,
+			"calls": len(self.latencies),
+			"throughput": len(self.latencies) / self.wall if self.wall else 0.,
+			"p50_ms": self.percentile(50) * 1000,
+			"p90_ms": self.percentile(90) * 1000,
+			"p99_ms": self.percentile(99) * 1000,
+			"max_ms": max(self.latencies, default=0.) * 1000,
+			"peak_rss_mb": self.peak_rss / 2**20,
+			"rss_increase_mb": (self.peak_rss - self.start_rss) / 2**20
+		}
+
+
+class MemoryView:
+	"""
+	Stand-in for TransientView built from the in-memory store
+	(id, t2 documents with unit and body, get_t2_result and get_journal_entries)
+	"""
+
+	def __init__(self, stock_id: Any, t2: Dict[str, Dict[str, Any]], journal: List[Dict[str, Any]]) -> None:
+		self.id = stock_id
+		self.t2 = tuple(SimpleNamespace(unit=unit, body=[body]) for unit, body in t2.items())
+		self.journal = journal
+
+	def get_t2_result(self, unit_id: str, **kwargs) -> Optional[Dict[str, Any]]:
+		for t2_view in self.t2:
+			if t2_view.unit == unit_id:
+				return t2_view.body[-1]["result"]
+		return None
+
+	def get_journal_entries(self, tier: Optional[int] = None, **kwargs) -> List[Dict[str, Any]]:
+		return [j for j in self.journal if tier is None or j["tier"] == tier]
+
+
+def load_unit(name: str, config: Optional[Dict[str, Any]], logger: Any) -> Any:
+	""" Instantiate unit registered in unit.yml """
+	with open(os.path.join(conf_dir, "unit.yml")) as f:
+		modules = {m.split(".")[-1]: m for m in yaml.safe_load(f)}
+	return getattr(import_module(modules[name]), name)(logger=logger, **(config or {}))
+
+
+def load_pickled_lightcurve() -> Dict[str, Any]:
+	"""
+	Photopoints and upper limits of t2/lightcurve.pickle, which was created with an
+	older ampel version. Its classes are mapped onto plain placeholders.
+	The stock is the ZTF name of the transient.
+	"""
+	class Placeholder:
+		def __init__(self, *args) -> None:
+			pass
+		def __setstate__(self, state) -> None:
+			self.__dict__.update(state if isinstance(state, dict) else {})
+
+	class Unpickler(pickle.Unpickler):
+		def find_class(self, module, name):
+			if module == "bson.int64":
+				return int
+			if module.startswith("ampel."):
+				return type(name, (Placeholder, ), {})
+			return super().find_class(module, name)
+
+	with open(pickle_file, "rb") as f:
+		lc = Unpickler(f).load()
+
+	pps = [po.content for po in lc.ppo_list]
+	return {
+		"stock": pps[0]["tranId"],
+		"pps": [{"_id": pp["_id"], "body": pp} for pp in pps],
+		"uls": [{"_id": ul.content["_id"], "body": ul.content} for ul in lc.ulo_list]
+	}
+
+
+def iter_alerts(path: str) -> Any:
+	""" Alerts of a local tarball """
+	from ampel.alert.load.TarAlertLoader import TarAlertLoader
+	from ampel.ztf.alert.ZiAlertSupplier import ZiAlertSupplier
+	supplier = ZiAlertSupplier(deserialize="avro")
+	supplier.set_alert_source(TarAlertLoader(file_path=path))
+	return iter(supplier)
+
+
+def match_t2(filter_conf: Optional[Dict[str, Any]], t2: Dict[str, Any]) -> bool:
+	""" Evaluate the t3 t2 filter (all_of/any_of, plain values and $lt/$lte/$gt/$gte/$ne) """
+	if not filter_conf:
+		return True
+	ops = {
+		"$lt": lambda a, b: a < b, "$lte": lambda a, b: a <= b,
+		"$gt": lambda a, b: a > b, "$gte": lambda a, b: a >= b,
+		"$ne": lambda a, b: a != b,
+	}
+
+	def match(el: Dict[str, Any]) -> bool:
+		res = t2.get(el["unit"])
+		if res is None:
+			return False
+		for k, v in el.get("match", {}).items():
+			if k not in res:
+				return False
+			if isinstance(v, dict):
+				if not all(ops[op](res[k], ref) for op, ref in v.items()):
+					return False
+			elif res[k] != v:
+				return False
+		return True
+
+	if "all_of" in filter_conf:
+		return all(match(el) for el in filter_conf["all_of"])
+	if "any_of" in filter_conf:
+		return any(match(el) for el in filter_conf["any_of"])
+	return match(filter_conf)
+
+
+def run(channel: Dict[str, Any], alerts: Optional[str], max_alerts: Optional[int],
+	t3_runs: int) -> List[Dict[str, Any]]:
+
+	from ampel.log.AmpelLogger import AmpelLogger
+	from ampel.view.LightCurve import LightCurve
+	from ampel.ztf.util.ZTFIdMapper import to_ampel_id
+
+	logger = AmpelLogger.get_logger()
+	stats: List[TierStats] = []
+
+	# In-memory store: datapoints, t2 body entries (result, ts) and journal per stock
+	pps: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+	uls: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+	t2: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+	journal: Dict[Any, List[Dict[str, Any]]] = {}
+
+	# T0
+	if alerts:
+		t0_unit = load_unit(channel["t0_filter"]["unit"], channel["t0_filter"].get("config"), logger)
+		with TierStats("t0") as s:
+			for i, alert in enumerate(iter_alerts(alerts)):
+				if max_alerts is not None and i >= max_alerts:
+					break
+				res = s.call(t0_unit.apply, alert)
+				if res is True or (type(res) is int and res > 0):
+					for pp in alert.pps:
+						pps.setdefault(alert.stock_id, {})[pp["candid"]] = {"_id": pp["candid"], "body": pp}
+					for ul in alert.uls or []:
+						uls.setdefault(alert.stock_id, {})[ul["jd"]] = {"_id": ul["jd"], "body": ul}
+		stats.append(s)
+
+	# T3HelloWorld (to_ztf_id) expects ampel ids
+	lc = load_pickled_lightcurve()
+	stock = to_ampel_id(lc["stock"])
+	pps[stock] = {pp["_id"]: pp for pp in lc["pps"]}
+	uls[stock] = {ul["_id"]: ul for ul in lc["uls"]}
+
+	# T2
+	t2_units = [
+		(el["unit"], load_unit(el["unit"], el.get("config"), logger))
+		for el in channel.get("t2_compute", [])
+	]
+	with TierStats("t2") as s:
+		for stock, dps in pps.items():
+			light_curve = LightCurve(
+				compound_id=str(stock).encode(), stock_id=stock,
+				photopoints=list(dps.values()), upperlimits=list(uls.get(stock, {}).values())
+			)
+			for name, unit in t2_units:
+				t2.setdefault(stock, {})[name] = {"result": s.call(unit.run, light_curve), "ts": time.time()}
+	stats.append(s)
+
+	# T3 (repeated runs exercise journal based units)
+	t3_conf = channel.get("t3_supervise", {})
+	selected = [
+		stock for stock in t2 if match_t2(
+			t3_conf.get("filter", {}).get("t2"), {k: v["result"] for k, v in t2[stock].items()}
+		)
+	]
+	with TierStats("t3") as s:
+		for i in range(t3_runs):
+			for el in t3_conf.get("run", []):
+				unit = load_unit(el["unit"], el.get("config"), logger)
+				views = [MemoryView(stock, t2[stock], journal.setdefault(stock, [])) for stock in selected]
+				with redirect_stdout(io.StringIO()):
+					jtweaks = s.call(unit.add, views)
+					unit.done()
+				for stock, jt in (jtweaks or {}).items():
+					journal[stock].append({"tier": 3, "ts": time.time(), "extra": jt.extra})
+	stats.append(s)
+
+	return [s.summary() for s in stats]
+
+
+def main() -> int:
+
+	parser = ArgumentParser(description=__doc__.split("\n")[1])
+	parser.add_argument("--channel", default=os.path.join(conf_dir, "channel", "SAMPLE_CHANNEL.yml"))
+	parser.add_argument("--alerts", help="alert tarball (T0 is skipped if not provided)")
+	parser.add_argument("--max-alerts", type=int)
+	parser.add_argument("--t3-runs", type=int, default=2)
+	parser.add_argument("--json", help="write results to this file")
+	parser.add_argument(
+		"--max-p99", action="append", default=[], metavar="TIER=MS",
+		help="fail if the p99 latency of a tier exceeds the given value [ms]"
+	)
+	args = parser.parse_args()
+
+	if args.max_p99 and not args.alerts:
+		parser.error("--max-p99 requires --alerts (a single light curve gives no meaningful percentiles)")
+	if not args.alerts:
+		print("No alert tarball provided: T0 skipped, T2/T3 run on the pickled light curve only")
+
+	with open(args.channel) as f:
+		channel = yaml.safe_load(f)
+
+	results = run(channel, args.alerts, args.max_alerts, args.t3_runs)
+
+	print(
+		f"{'tier':<5}{'calls':>8}{'calls/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+		f"{'max ms':>10}{'RSS MB':>10}{'+RSS MB':>10}"
+	)
+	for r in results:
+		print(
+			f"{r['tier']:<5}{r['calls']:>8}{r['throughput']:>10.1f}{r['p50_ms']:>10.2f}"
+			f"{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}"
+			f"{r['peak_rss_mb']:>10.1f}{r['rss_increase_mb']:>10.1f}"
+		)
+
+	if args.json:
+		with open(args.json, "w") as f:
+			json.dump(results, f, indent=2)
+
+	failed = False
+	budgets = dict(el.split("=") for el in args.max_p99)
+	for r in results:
+		if r["tier"] in budgets and r["p99_ms"] > float(budgets[r["tier"]]):
+			print(f"{r['tier']} p99 latency above budget ({budgets[r['tier']]} ms)")
+			failed = True
+
+	return 1 if failed else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
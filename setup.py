@@ -52,4 +52,8 @@ setup(
         # pymage secretly depends on pandas
 #        "pandas",
     ],
+    extras_require={
+        # T3T2ParquetExporter / util.t2parquet
+        "export": ["pyarrow"],
+    },
 )
@@ -0,0 +1,92 @@
+import json
+
+from ampel.contrib.sample.util.DecisionMemo import DecisionMemo
+
+config = {"min_gal_lat": 15}
+
+
+def test_lru_eviction():
+	memo = DecisionMemo(config, max_size=2)
+	for stock in (1, 2):
+		memo.get_or_compute(stock, 10., 20., lambda: stock)
+	memo.get_or_compute(1, 10., 20., lambda: None) # 1 most recently used
+	memo.get_or_compute(3, 10., 20., lambda: 3)
+	assert list(memo.memo) == [1, 3]
+	assert memo.stats() == {"hits": 1, "misses": 3, "hitRate": 0.25, "size": 2}
+
+
+def test_position_tolerance():
+	memo = DecisionMemo(config, tolerance=1.)
+	calls = []
+	def compute():
+		calls.append(1)
+		return {"veto": True}
+	# astrometric scatter of repeated detections (0.3 arcsec), also across ra = 0
+	for ra, dec in ((0., 45.), (359.9999, 45.), (0.00005, 45.00005)):
+		assert memo.get_or_compute(1, ra, dec, compute) == {"veto": True}
+	assert len(calls) == 1
+	# moved by 2 arcsec: recomputed
+	memo.get_or_compute(1, 0., 45. + 2 / 3600, compute)
+	assert len(calls) == 2 and memo.memo[1][:2] == (0., 45. + 2 / 3600)
+
+
+def test_persistence_round_trip(tmp_path):
+	path = str(tmp_path / "memo.json")
+	memo = DecisionMemo(config, path=path)
+	memo.get_or_compute("ZTF20aaaaaaa", 10., 20., lambda: {"veto": "gal_lat"})
+	memo.get_or_compute(2, 11., 21., lambda: None)
+	memo.save()
+
+	loaded = DecisionMemo(config, path=path)
+	assert not loaded.invalidated
+	assert loaded.memo == memo.memo
+	assert loaded.get_or_compute(2, 11., 21., lambda: False) is None
+	assert loaded.get_or_compute("ZTF20aaaaaaa", 10., 20., lambda: None) == {"veto": "gal_lat"}
+
+
+def test_config_invalidation(tmp_path):
+	path = str(tmp_path / "memo.json")
+	memo = DecisionMemo(config, path=path)
+	memo.get_or_compute(1, 10., 20., lambda: True)
+	memo.save()
+
+	for other in (DecisionMemo({"min_gal_lat": 20}, path=path), DecisionMemo(config, tolerance=2., path=path)):
+		assert other.invalidated and not other.memo
+
+	# Saved with the new config, previous entries dropped
+	other.save()
+	with open(path) as f:
+		doc = json.load(f)
+	assert doc["config"] == other.config_hash and doc["memo"] == []
+
+
+def test_save_merges_entries_of_other_processes(tmp_path):
+	path = str(tmp_path / "memo.json")
+	a = DecisionMemo(config, max_size=3, path=path)
+	b = DecisionMemo(config, max_size=3, path=path)
+	a.get_or_compute(1, 10., 20., lambda: "a")
+	b.get_or_compute(2, 10., 20., lambda: "b")
+	a.save()
+	b.save()
+	assert set(DecisionMemo(config, path=path).memo) == {1, 2}
+
+	# An empty memo does not erase saved entries
+	DecisionMemo(config, path=path).save()
+	assert set(DecisionMemo(config, path=path).memo) == {1, 2}
+
+	# Bounded by max_size, oldest file entries dropped first
+	for stock in (3, 4):
+		b.get_or_compute(stock, 10., 20., lambda: "b")
+	b.save()
+	assert list(DecisionMemo(config, path=path).memo) == [1, 2, 3, 4][-3:]
+
+
+def test_checkpoint(tmp_path):
+	path = str(tmp_path / "memo.json")
+	memo = DecisionMemo(config, path=path, checkpoint_every=2)
+	memo.get_or_compute(1, 10., 20., lambda: True)
+	assert not memo.checkpoint_due()
+	memo.get_or_compute(1, 10., 20., lambda: True)
+	assert memo.checkpoint_due()
+	assert memo.checkpoint()["hits"] == 1
+	assert DecisionMemo(config, path=path).memo == memo.memo
@@ -0,0 +1,58 @@
+import os, sys
+import pytest
+
+pytest.importorskip("ampel.abstract.AbsT3Unit")
+
+from ampel.log.AmpelLogger import AmpelLogger
+from ampel.ztf.util.ZTFIdMapper import to_ampel_id
+from ampel.contrib.sample.t3.T3HelloWorld import T3HelloWorld
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from pipeline import MemoryView
+
+t2 = {
+	"T2SNcosmoComp": {"result": {"target_match": True, "chidof_target": 0.9}, "ts": 1.},
+	"T2MultiMessMatch": {"result": {"best_match": 0.5}, "ts": 1.}
+}
+
+
+def get_unit(scope):
+	return T3HelloWorld(
+		logger=AmpelLogger.get_logger(), t2info_from=list(t2),
+		skip_unchanged=True, fingerprint_scope=scope
+	)
+
+
+def run(unit, journal):
+	""" Journal extras returned by unit.add for a single transient """
+	stock = to_ampel_id("ZTF20aaaaaaa")
+	jtweaks = unit.add([MemoryView(stock, t2, journal)])
+	return jtweaks[stock].extra if stock in jtweaks else None
+
+
+def test_skip_unchanged_same_scope():
+	unit = get_unit("a")
+	extra = run(unit, [])
+	assert extra["success"] and extra["scope"] == "a" and extra["fingerprint"]
+	assert run(unit, [{"tier": 3, "extra": extra}]) is None
+
+
+def test_other_scope_reacts():
+	extra = run(get_unit("a"), [])
+	assert run(get_unit("b"), [{"tier": 3, "extra": extra}])["scope"] == "b"
+
+
+def test_failed_reaction_is_retried():
+	extra = {**run(get_unit("a"), []), "success": False}
+	assert run(get_unit("a"), [{"tier": 3, "extra": extra}]) is not None
+
+
+def test_changed_info_reacts():
+	unit = get_unit("a")
+	extra = run(unit, [])
+	t2_before = t2["T2MultiMessMatch"]
+	t2["T2MultiMessMatch"] = {"result": {"best_match": 0.4}, "ts": 2.}
+	try:
+		assert run(unit, [{"tier": 3, "extra": extra}])["fingerprint"] != extra["fingerprint"]
+	finally:
+		t2["T2MultiMessMatch"] = t2_before
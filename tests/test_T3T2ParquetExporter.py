@@ -0,0 +1,38 @@
+import os, sys
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("ampel.abstract.AbsT3Unit")
+
+from ampel.log.AmpelLogger import AmpelLogger
+from ampel.contrib.sample.t3.T3T2ParquetExporter import T3T2ParquetExporter
+from ampel.contrib.sample.util.t2parquet import query
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from pipeline import MemoryView
+
+
+def export(base_dir, t2):
+	unit = T3T2ParquetExporter(logger=AmpelLogger.get_logger(), base_dir=base_dir)
+	unit.add([MemoryView(stock, t2s, []) for stock, t2s in t2.items()])
+	unit.done()
+
+
+def test_only_new_results_are_exported(tmp_path):
+
+	t2 = {
+		1: {"T2SNcosmoComp": {"result": {"target_match": True}, "ts": 1000.}},
+		2: {"T2SNcosmoComp": {"result": {"target_match": False}, "ts": 1000.}}
+	}
+	export(str(tmp_path), t2)
+	export(str(tmp_path), t2)
+	assert query(str(tmp_path), "T2SNcosmoComp", None, ["stock"], latest=False).num_rows == 2
+
+	t2[2]["T2SNcosmoComp"] = {"result": {"target_match": True}, "ts": 2000.}
+	export(str(tmp_path), t2)
+	table = query(str(tmp_path), "T2SNcosmoComp", None, ["stock", "ts", "target_match"], latest=False)
+	assert sorted(table.to_pylist(), key=lambda r: (r["stock"], r["ts"])) == [
+		{"stock": 1, "ts": 1000., "target_match": True},
+		{"stock": 2, "ts": 1000., "target_match": False},
+		{"stock": 2, "ts": 2000., "target_match": True}
+	]
@@ -0,0 +1,18 @@
+import os, sys
+import pytest
+
+for mod in ("ampel.abstract.AbsAlertFilter", "ampel.abstract.AbsLightCurveT2Unit", "ampel.abstract.AbsT3Unit"):
+	pytest.importorskip(mod)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from import_time import get_modules, measure
+
+# Max import time per unit module [s], same default as benchmarks/import_time.py
+budget = float(os.environ.get("AMPEL_SAMPLE_IMPORT_BUDGET", 0.2))
+
+
+@pytest.mark.parametrize("module", get_modules())
+def test_import_budget(module):
+	dt, loaded = measure(module)
+	assert not loaded, f"heavy imports: {loaded}"
+	assert dt <= budget
@@ -0,0 +1,48 @@
+import importlib, os
+import pytest
+
+from ampel.contrib.sample.util import metrics
+
+
+@pytest.fixture
+def instrumented(tmp_path, monkeypatch):
+	monkeypatch.setenv("AMPEL_SAMPLE_METRICS", str(tmp_path / "metrics.{pid}.prom"))
+	monkeypatch.setenv("AMPEL_SAMPLE_PROFILE_FLAG", str(tmp_path / "profile"))
+	monkeypatch.setenv("AMPEL_SAMPLE_PROFILE_DIR", str(tmp_path))
+	monkeypatch.setenv("AMPEL_SAMPLE_FLUSH_INTERVAL", "0")
+	yield importlib.reload(metrics)
+	monkeypatch.undo()
+	importlib.reload(metrics)
+
+
+def test_periodic_flush_and_profile_flag(instrumented, tmp_path):
+
+	class Unit:
+		@instrumented.instrument
+		def run(self, x):
+			return x
+
+	unit = Unit()
+	assert unit.run(1) == 1
+	assert not instrumented.profiling
+
+	# Written while running (no exit needed)
+	unit.run(2)
+	prom = (tmp_path / f"metrics.{os.getpid()}.prom").read_text()
+	assert 'ampel_unit_call_seconds_count{unit="Unit",method="run"} 1' in prom
+
+	# Profiling switched on and off at runtime
+	(tmp_path / "profile").touch()
+	unit.run(3)
+	assert instrumented.profiling
+	unit.run(4)
+	(tmp_path / "profile").unlink()
+	unit.run(5)
+	assert not instrumented.profiling
+	assert len(list(tmp_path.glob("Unit.run.*.prof"))) == 2
+
+
+def test_disabled_is_noop():
+	def run(self):
+		pass
+	assert metrics.instrument(run) is run
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pytest
+
+from astropy.io import fits
+from ampel.contrib.sample.util import mwebv
+
+# Synthetic map: linear in the pixel coordinates, such that bilinear interpolation is exact
+size, crpix, lam_scal = 64, 32.5, 20.
+
+
+def make_map(path, sign):
+	y, x = np.mgrid[:size, :size]
+	hdu = fits.PrimaryHDU((x + 100. * y).astype(np.float32))
+	hdu.header.update({"CRPIX1": crpix, "CRPIX2": crpix, "LAM_SCAL": lam_scal, "LAM_NSGP": sign})
+	hdu.writeto(path)
+
+
+def pixel_value(x, y):
+	return x + 100. * y
+
+
+@pytest.fixture
+def mapdir(tmp_path):
+	make_map(tmp_path / "SFD_dust_4096_ngp.fits", 1)
+	make_map(tmp_path / "SFD_dust_4096_sgp.fits", -1)
+	yield str(tmp_path)
+	mwebv._maps.pop(str(tmp_path), None)
+
+
+def test_projection(mapdir):
+
+	north, south = mwebv.get_maps(mapdir)
+	c = crpix - 1
+	# (l, b) [deg] -> expected pixel (x, y), following the SFD Lambert projection
+	cases = [
+		(north, 0., 90., c, c),
+		(north, 0., 0., c + lam_scal, c),
+		(north, 90., 0., c, c - lam_scal),
+		(north, 180., 30., c - lam_scal * np.sqrt(0.5), c),
+		(south, 90., 0., c, c + lam_scal),
+		(south, 0., -90., c, c),
+	]
+	for hemi, l, b, x, y in cases:
+		ebv = hemi.ebv(np.radians([l]), np.radians([b]))
+		np.testing.assert_allclose(ebv, pixel_value(x, y), rtol=1e-6, atol=1e-3)
+
+
+def test_get_ebv(mapdir):
+
+	# Galactic poles, scaled by the Schlafly & Finkbeiner factor
+	ra, dec = [192.85948, 12.85948], [27.12825, -27.12825]
+	c = crpix - 1
+	np.testing.assert_allclose(
+		mwebv.get_ebv(ra, dec, mapdir), mwebv.scaling * pixel_value(c, c), rtol=1e-5
+	)
+	assert mwebv.ebv_at(ra[0], dec[0], mapdir) == pytest.approx(mwebv.scaling * pixel_value(c, c), rel=1e-5)
+
+
+@pytest.mark.skipif(not os.environ.get("SFD_DIR"), reason="SFD maps not available (SFD_DIR)")
+def test_same_as_sfdmap():
+	sfdmap = pytest.importorskip("sfdmap")
+	rng = np.random.default_rng(1)
+	ra, dec = rng.uniform(0, 360, 200), np.degrees(np.arcsin(rng.uniform(-1, 1, 200)))
+	np.testing.assert_allclose(
+		mwebv.get_ebv(ra, dec), sfdmap.SFDMap(os.environ["SFD_DIR"]).ebv(ra, dec), rtol=1e-5
+	)
@@ -0,0 +1,65 @@
+import os, sys
+import numpy as np
+import pytest
+
+from astropy.table import Table
+from ampel.contrib.sample.util.photometry import get_photometry
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+from pipeline import load_pickled_lightcurve
+
+try:
+	from ampel.view.LightCurve import LightCurve
+except ImportError:
+	class LightCurve: # type: ignore[no-redef]
+		""" Stand-in providing the get_ntuples semantics of ampel.view.LightCurve """
+		def __init__(self, compound_id, stock_id, photopoints, upperlimits=None):
+			self.compound_id = compound_id
+			self.stock_id = stock_id
+			self.photopoints = photopoints
+			self.upperlimits = upperlimits
+
+		def get_ntuples(self, params):
+			return [
+				tuple(pp["body"][p] for p in params)
+				for pp in self.photopoints if all(p in pp["body"] for p in params)
+			]
+
+
+@pytest.fixture
+def light_curve():
+	lc = load_pickled_lightcurve()
+	return LightCurve(
+		compound_id=b"test", stock_id=lc["stock"], photopoints=lc["pps"], upperlimits=lc["uls"]
+	)
+
+
+def test_same_as_get_ntuples_table(light_curve):
+
+	# Previous T2SNcosmoComp input table
+	tab = Table(
+		np.asarray(light_curve.get_ntuples(("jd", "magpsf", "sigmapsf", "fid"))),
+		names=("jd", "magpsf", "sigmapsf", "fid")
+	)
+	tab["flux"] = 10 ** (-(tab["magpsf"] - 25) / 2.5)
+	tab["fluxerr"] = np.abs(tab["flux"] * (-tab["sigmapsf"] / 2.5 * np.log(10)))
+	tab.sort("jd")
+
+	phot = get_photometry(light_curve)
+	assert len(phot) == len(tab) > 0
+	for col in ("jd", "magpsf", "sigmapsf", "fid", "flux", "fluxerr"):
+		np.testing.assert_allclose(phot[col], tab[col], rtol=1e-12)
+
+	# Previous T2MultiMessMatch input, sorted by jd
+	tdata = light_curve.get_ntuples(("ra", "dec", "jd", "magpsf", "sigmapsf"))
+	tdata.sort(key=lambda x: x[2])
+	np.testing.assert_array_equal(
+		np.array(tdata), np.column_stack([phot[k] for k in ("ra", "dec", "jd", "magpsf", "sigmapsf")])
+	)
+
+
+def test_cached_and_read_only(light_curve):
+	phot = get_photometry(light_curve)
+	assert get_photometry(light_curve) is phot
+	with pytest.raises(ValueError):
+		phot["flux"][0] = 0
@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pyarrow.dataset import field
+from ampel.contrib.sample.util.t2parquet import last_export, query, select_stocks, to_rows, write_rows
+
+
+def test_mixed_failure_and_success_rows(tmp_path):
+
+	rows = to_rows(
+		1, "T2SNcosmoComp",
+		{"chidof_base": -1, "chidof_target": 0, "model_match": False, "info": "basefit fails"}
+	) + to_rows(
+		2, "T2SNcosmoComp",
+		{
+			"chidof_base": 1.5, "chidof_target": 0.9, "base_model": "salt2",
+			"target_model": "v19-2009ip-corr", "target_match": True, "info": "Good match"
+		}
+	)
+	write_rows(rows, str(tmp_path), "T2SNcosmoComp")
+
+	for stock, best_match in ((1, 0.5), (2, 0.2), (3, 5.)):
+		write_rows(
+			to_rows(
+				stock, "T2MultiMessMatch",
+				{"matches": [{"comb_pull": best_match, "mm_ID": "a"}], "best_match": best_match},
+				explode="matches"
+			),
+			str(tmp_path), "T2MultiMessMatch"
+		)
+
+	table = query(str(tmp_path), "T2SNcosmoComp", field("target_match") == True, ["stock"])
+	assert table.column("stock").to_pylist() == [2]
+
+	assert select_stocks(
+		str(tmp_path), {
+			"T2SNcosmoComp": field("target_match") == True,
+			"T2MultiMessMatch": field("best_match") < 1
+		}
+	) == {2}
+
+
+def test_latest_result_of_stock_exported_twice(tmp_path):
+
+	for ts, chidof in ((1000., 3.), (2000., 0.9)):
+		write_rows(
+			to_rows(1, "T2SNcosmoComp", {"chidof_target": chidof, "target_match": chidof < 2}, ts),
+			str(tmp_path), "T2SNcosmoComp"
+		)
+
+	assert last_export(str(tmp_path), "T2SNcosmoComp") == {1: 2000.}
+	assert last_export(str(tmp_path), "T2MultiMessMatch") == {}
+
+	table = query(str(tmp_path), "T2SNcosmoComp", None, ["stock", "ts", "chidof_target"])
+	assert table.to_pylist() == [{"stock": 1, "ts": 2000., "chidof_target": 0.9}]
+	assert query(str(tmp_path), "T2SNcosmoComp", None, ["ts"], latest=False).num_rows == 2
+
+	# The older result matches, but is superseded
+	assert query(str(tmp_path), "T2SNcosmoComp", field("target_match") == False, ["stock"]).num_rows == 0
+
+
+def test_exploded_matches(tmp_path):
+
+	rows = to_rows(
+		1, "T2MultiMessMatch",
+		{
+			"matches": [{"comb_pull": 0.5, "mm_ID": "a"}, {"comb_pull": 3., "mm_ID": "b"}],
+			"best_match": 0.5
+		},
+		1000., explode="matches"
+	)
+	assert [(r["matches_idx"], r["matches_mm_ID"], r["best_match"]) for r in rows] == \
+		[(0, "a", 0.5), (1, "b", 0.5)]
+
+	write_rows(rows, str(tmp_path), "T2MultiMessMatch")
+	table = query(
+		str(tmp_path), "T2MultiMessMatch", field("matches_comb_pull") > 1, ["stock", "matches_mm_ID"]
+	)
+	assert table.to_pylist() == [{"stock": 1, "matches_mm_ID": "b"}]
+	assert query(str(tmp_path), "T2MultiMessMatch", None, ["stock"]).num_rows == 2